@@ -1,6 +1,18 @@
 import asyncio
 import websockets
-import json
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+import rps_pb2
+from rps_net import set_nodelay
+
+VALID_MOVES = frozenset(("rock", "paper", "scissors"))
+VALID_REMATCH = frozenset(("yes", "no"))
+REMATCH_YES = b"\x01"
+REMATCH_NO = b"\x00"
 
 def validate_move(move):
     """
@@ -12,78 +24,182 @@ def validate_move(move):
     Returns:
         bool: True if the move is valid (rock, paper, or scissors), otherwise False.
     """
-    valid_moves = ["rock", "paper", "scissors"]
-    return move in valid_moves
+    return move in VALID_MOVES
+
+async def ainput(prompt):
+    """
+    Reads a line from standard input without blocking the event loop.
+
+    Args:
+        prompt (str): The prompt to display.
+
+    Returns:
+        str: The line entered by the user.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, input, prompt)
+
+class ClientState:
+    """
+    Holds the client state shared between message handlers.
+
+    Attributes:
+        player (rps_pb2.Player): The player assigned by the server, or None before the game starts.
+        finished (bool): A flag indicating whether the game session has ended.
+    """
+
+    __slots__ = ("player", "finished")
+
+    def __init__(self):
+        """
+        Initializes the state before the game starts.
+        """
+        self.player = None
+        self.finished = False
+
+async def _handle_waiting(message, websocket, state):
+    """
+    Prints the notice that the player is waiting for an opponent.
+
+    Args:
+        message (rps_pb2.ServerMsg): The received message.
+        websocket (websockets.asyncio.client.ClientConnection): The WebSocket connection to the server.
+        state (ClientState): The client state.
+    """
+    print(message.message)
+
+async def _handle_start(message, websocket, state):
+    """
+    Prints the start message and remembers which player this client is.
+
+    Args:
+        message (rps_pb2.ServerMsg): The received message.
+        websocket (websockets.asyncio.client.ClientConnection): The WebSocket connection to the server.
+        state (ClientState): The client state; its player is set from the message.
+    """
+    state.player = message.player
+    print(message.message)
+
+async def _handle_move(message, websocket, state):
+    """
+    Asks the player for a move until a valid one is entered and sends it to the server.
+
+    Args:
+        message (rps_pb2.ServerMsg): The received message.
+        websocket (websockets.asyncio.client.ClientConnection): The WebSocket connection to the server.
+        state (ClientState): The client state.
+    """
+    print(message.message)
+    move = ""
+    while not validate_move(move):
+        move = (await ainput("Enter your move (rock, paper, or scissors): ")).strip().lower()
+        if not validate_move(move):
+            print("Invalid move. Please enter 'rock', 'paper', or 'scissors'.")
+    await websocket.send(rps_pb2.ClientMsg(move=rps_pb2.Move.Value(move.upper())).SerializeToString())
+
+async def _handle_result(message, websocket, state):
+    """
+    Prints both moves and the outcome of the round for this player.
+
+    Args:
+        message (rps_pb2.ServerMsg): The received message.
+        websocket (websockets.asyncio.client.ClientConnection): The WebSocket connection to the server.
+        state (ClientState): The client state, used to tell whether this player won.
+    """
+    move1 = rps_pb2.Move.Name(message.move1).lower()
+    move2 = rps_pb2.Move.Name(message.move2).lower()
+    result = message.result
+    print(f"Player 1 chose: {move1}")
+    print(f"Player 2 chose: {move2}")
+
+    if result == rps_pb2.DRAW:
+        print("Draw!")
+    elif (result == rps_pb2.PLAYER1_WINS and state.player == rps_pb2.PLAYER1) or (
+        result == rps_pb2.PLAYER2_WINS and state.player == rps_pb2.PLAYER2
+    ):
+        print("You won!")
+    else:
+        print("You lost.")
+
+async def _handle_rematch(message, websocket, state):
+    """
+    Asks the player whether to play again and sends the answer to the server.
+
+    Args:
+        message (rps_pb2.ServerMsg): The received message.
+        websocket (websockets.asyncio.client.ClientConnection): The WebSocket connection to the server.
+        state (ClientState): The client state.
+    """
+    answer = ""
+    while answer not in VALID_REMATCH:
+        answer = (await ainput("Do you want to play again? (yes/no): ")).strip().lower()
+        if answer not in VALID_REMATCH:
+            print("Invalid response. Please enter 'yes' or 'no'.")
+    await websocket.send(REMATCH_YES if answer == "yes" else REMATCH_NO)
+
+async def _handle_end(message, websocket, state):
+    """
+    Prints that the game is over and ends the session.
+
+    Args:
+        message (rps_pb2.ServerMsg): The received message.
+        websocket (websockets.asyncio.client.ClientConnection): The WebSocket connection to the server.
+        state (ClientState): The client state; it is marked as finished.
+    """
+    print("Game over.")
+    state.finished = True
+
+async def _handle_error(message, websocket, state):
+    """
+    Prints the error reported by the server and ends the session.
+
+    Args:
+        message (rps_pb2.ServerMsg): The received message.
+        websocket (websockets.asyncio.client.ClientConnection): The WebSocket connection to the server.
+        state (ClientState): The client state; it is marked as finished.
+    """
+    print("Error:", message.message)
+    state.finished = True
+
+# Maps a server message type to the coroutine handling it.
+HANDLERS = {
+    rps_pb2.WAITING: _handle_waiting,
+    rps_pb2.START: _handle_start,
+    rps_pb2.YOUR_MOVE: _handle_move,
+    rps_pb2.RESULT: _handle_result,
+    rps_pb2.REMATCH: _handle_rematch,
+    rps_pb2.END: _handle_end,
+    rps_pb2.ERROR: _handle_error,
+}
 
 async def play():
     """
     Connect to the server and play the game.
 
-    Establishes a WebSocket connection with the server, handles game logic including
-    sending moves, receiving results, and responding to rematch requests.
+    Establishes a WebSocket connection with the server and dispatches every
+    received message to its handler in HANDLERS until the session ends.
     """
     uri = "ws://localhost:6789"  # Server address
-    async with websockets.connect(uri) as websocket:
-        player = None  # Will hold 'player1' or 'player2'
-        while True:
+    async with websockets.connect(uri, compression=None) as websocket:
+        set_nodelay(websocket)
+        state = ClientState()
+        message = rps_pb2.ServerMsg()  # Reused for every received frame
+        while not state.finished:
             try:
                 data = await websocket.recv()  # Receive data from the server
-                message = json.loads(data)  # Parse JSON message
-
-                if message["type"] == "waiting":
-                    print(message["message"])
-
-                elif message["type"] == "start":
-                    player = message["player"]
-                    print(message["message"])
-
-                elif message["type"] == "your_move":
-                    print(message["message"])
-                    move = ""
-                    while not validate_move(move):
-                        move = input("Enter your move (rock, paper, or scissors): ").strip().lower()
-                        if not validate_move(move):
-                            print("Invalid move. Please enter 'rock', 'paper', or 'scissors'.")
-                    await websocket.send(json.dumps({"move": move}))
-
-                elif message["type"] == "result":
-                    move1 = message["move1"]
-                    move2 = message["move2"]
-                    result = message["result"]
-                    print(f"Player 1 chose: {move1}")
-                    print(f"Player 2 chose: {move2}")
-
-                    if result == "draw":
-                        print("Draw!")
-                    elif (result == "player1" and player == "player1") or (
-                        result == "player2" and player == "player2"
-                    ):
-                        print("You won!")
-                    else:
-                        print("You lost.")
-
-                elif message["type"] == "rematch":
-                    answer = ""
-                    while answer not in ["yes", "no"]:
-                        answer = input("Do you want to play again? (yes/no): ").strip().lower()
-                        if answer not in ["yes", "no"]:
-                            print("Invalid response. Please enter 'yes' or 'no'.")
-                    await websocket.send(json.dumps({"rematch": answer}))
-
-                elif message["type"] == "end":
-                    print("Game over.")
-                    break
-
-                elif message["type"] == "error":
-                    print("Error:", message["message"])
-                    break
-
-                else:
+                message.ParseFromString(data)  # Parse Protobuf message
+                handler = HANDLERS.get(message.type)
+                if handler is None:
                     print("Unknown message:", message)
+                    continue
+                await handler(message, websocket, state)
 
             except websockets.exceptions.ConnectionClosed:
                 print("Connection closed")
                 break
 
 if __name__ == "__main__":
-    asyncio.run(play())
+    if uvloop is not None:
+        uvloop.run(play())
+    else:
+        asyncio.run(play())
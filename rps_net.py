@@ -0,0 +1,16 @@
+import socket
+
+
+def set_nodelay(websocket):
+    """
+    Disables Nagle's algorithm on the TCP socket of a WebSocket connection.
+
+    asyncio and uvloop already do this for TCP transports; setting it here keeps
+    small game frames from being delayed on any other event loop.
+
+    Args:
+        websocket (websockets.asyncio.connection.Connection): The WebSocket connection.
+    """
+    sock = websocket.transport.get_extra_info("socket")
+    if sock is not None:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
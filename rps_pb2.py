@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: rps.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\trps.proto\x12\x03rps\"\xa6\x01\n\tServerMsg\x12\x1a\n\x04type\x18\x01 \x01(\x0e\x32\x0c.rps.MsgType\x12\x1b\n\x06player\x18\x02 \x01(\x0e\x32\x0b.rps.Player\x12\x18\n\x05move1\x18\x03 \x01(\x0e\x32\t.rps.Move\x12\x18\n\x05move2\x18\x04 \x01(\x0e\x32\t.rps.Move\x12\x1b\n\x06result\x18\x05 \x01(\x0e\x32\x0b.rps.Result\x12\x0f\n\x07message\x18\x06 \x01(\t\"2\n\tClientMsg\x12\x1c\n\x04move\x18\x01 \x01(\x0e\x32\t.rps.MoveH\x00\x88\x01\x01\x42\x07\n\x05_move*]\n\x07MsgType\x12\x0b\n\x07WAITING\x10\x00\x12\t\n\x05START\x10\x01\x12\r\n\tYOUR_MOVE\x10\x02\x12\n\n\x06RESULT\x10\x03\x12\x0b\n\x07REMATCH\x10\x04\x12\x07\n\x03\x45ND\x10\x05\x12\t\n\x05\x45RROR\x10\x06*)\n\x04Move\x12\x08\n\x04ROCK\x10\x00\x12\t\n\x05PAPER\x10\x01\x12\x0c\n\x08SCISSORS\x10\x02*\"\n\x06Player\x12\x0b\n\x07PLAYER1\x10\x00\x12\x0b\n\x07PLAYER2\x10\x01*6\n\x06Result\x12\x08\n\x04\x44RAW\x10\x00\x12\x10\n\x0cPLAYER1_WINS\x10\x01\x12\x10\n\x0cPLAYER2_WINS\x10\x02\x62\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'rps_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _MSGTYPE._serialized_start=239
+  _MSGTYPE._serialized_end=332
+  _MOVE._serialized_start=334
+  _MOVE._serialized_end=375
+  _PLAYER._serialized_start=377
+  _PLAYER._serialized_end=411
+  _RESULT._serialized_start=413
+  _RESULT._serialized_end=467
+  _SERVERMSG._serialized_start=19
+  _SERVERMSG._serialized_end=185
+  _CLIENTMSG._serialized_start=187
+  _CLIENTMSG._serialized_end=237
+# @@protoc_insertion_point(module_scope)
@@ -1,6 +1,56 @@
 import asyncio
 import websockets
-import json
+from collections import OrderedDict
+from google.protobuf.message import DecodeError
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+import rps_pb2
+from rps_net import set_nodelay
+
+# Frames buffered per connection before the server stops reading from its socket.
+QUEUE_SIZE = 16
+VALID_MOVES = frozenset(rps_pb2.Move.values())
+REMATCH_YES = b"\x01"
+
+WAITING_MSG = rps_pb2.ServerMsg(type=rps_pb2.WAITING, message="Waiting for an opponent...").SerializeToString()
+START_P1_MSG = rps_pb2.ServerMsg(
+    type=rps_pb2.START, player=rps_pb2.PLAYER1, message="Game started. You are Player 1"
+).SerializeToString()
+START_P2_MSG = rps_pb2.ServerMsg(
+    type=rps_pb2.START, player=rps_pb2.PLAYER2, message="Game started. You are Player 2"
+).SerializeToString()
+YOUR_MOVE_MSG = rps_pb2.ServerMsg(
+    type=rps_pb2.YOUR_MOVE, message="Enter your move (rock, paper, or scissors):"
+).SerializeToString()
+INVALID_MOVE_MSG = rps_pb2.ServerMsg(type=rps_pb2.ERROR, message="Invalid move").SerializeToString()
+ROUND_ERROR_MSG = rps_pb2.ServerMsg(
+    type=rps_pb2.ERROR, message="A player disconnected or made an invalid move."
+).SerializeToString()
+REMATCH_MSG = rps_pb2.ServerMsg(type=rps_pb2.REMATCH).SerializeToString()
+END_MSG = rps_pb2.ServerMsg(type=rps_pb2.END, message="Game over.").SerializeToString()
+
+# Outcome of a round under traditional Rock-Paper-Scissors rules, indexed as RESULTS[move1][move2]
+# (rows/columns: ROCK, PAPER, SCISSORS).
+RESULTS = (
+    (rps_pb2.DRAW, rps_pb2.PLAYER2_WINS, rps_pb2.PLAYER1_WINS),
+    (rps_pb2.PLAYER1_WINS, rps_pb2.DRAW, rps_pb2.PLAYER2_WINS),
+    (rps_pb2.PLAYER2_WINS, rps_pb2.PLAYER1_WINS, rps_pb2.DRAW),
+)
+
+# Serialized RESULT message for every pair of moves, indexed like RESULTS.
+RESULT_MSGS = tuple(
+    tuple(
+        rps_pb2.ServerMsg(
+            type=rps_pb2.RESULT, move1=move1, move2=move2, result=RESULTS[move1][move2]
+        ).SerializeToString()
+        for move2 in rps_pb2.Move.values()
+    )
+    for move1 in rps_pb2.Move.values()
+)
 
 class RockPaperScissorsGame:
     """
@@ -9,22 +59,47 @@ class RockPaperScissorsGame:
     Attributes:
         player1_ws (websockets.WebSocketServerProtocol): WebSocket for Player 1.
         player2_ws (websockets.WebSocketServerProtocol): WebSocket for Player 2.
-        players (dict): A dictionary mapping WebSocket connections to their moves.
-        game_over (bool): A flag indicating whether the game has ended.
+        player1_queue (asyncio.Queue): Frames received from Player 1, None once the connection closes.
+        player2_queue (asyncio.Queue): Frames received from Player 2, None once the connection closes.
+        move1 (rps_pb2.Move): Move of Player 1, or None if not received yet.
+        move2 (rps_pb2.Move): Move of Player 2, or None if not received yet.
     """
 
-    def __init__(self, player1_ws, player2_ws):
+    __slots__ = ("player1_ws", "player2_ws", "player1_queue", "player2_queue", "move1", "move2")
+
+    def __init__(self, player1_ws, player1_queue, player2_ws, player2_queue):
         """
         Initializes the game with two player WebSocket connections.
 
         Args:
             player1_ws (websockets.WebSocketServerProtocol): WebSocket for Player 1.
+            player1_queue (asyncio.Queue): Queue fed by the reader task of Player 1.
             player2_ws (websockets.WebSocketServerProtocol): WebSocket for Player 2.
+            player2_queue (asyncio.Queue): Queue fed by the reader task of Player 2.
         """
-        self.players = {player1_ws: None, player2_ws: None}
         self.player1_ws = player1_ws
         self.player2_ws = player2_ws
-        self.game_over = False
+        self.player1_queue = player1_queue
+        self.player2_queue = player2_queue
+        self.move1 = None
+        self.move2 = None
+
+    async def receive(self, websocket):
+        """
+        Waits for the next frame from a player.
+
+        Args:
+            websocket (websockets.WebSocketServerProtocol): The WebSocket connection of the player.
+
+        Returns:
+            bytes: The received frame, or None if the connection is closed.
+        """
+        queue = self.player1_queue if websocket is self.player1_ws else self.player2_queue
+        data = await queue.get()
+        if data is None:
+            # Keep the marker queued so later reads see the closed connection too.
+            queue.put_nowait(None)
+        return data
 
     async def receive_move(self, websocket):
         """
@@ -36,72 +111,93 @@ class RockPaperScissorsGame:
         Returns:
             bool: True if the move is valid, otherwise False.
         """
-        try:
-            data = await websocket.recv()
-            message = json.loads(data)
-            move = message.get("move")
-            if move not in ["rock", "paper", "scissors"]:
-                await websocket.send(json.dumps({"type": "error", "message": "Invalid move"}))
-                return False
-            self.players[websocket] = move
-            return True
-        except websockets.exceptions.ConnectionClosed:
+        data = await self.receive(websocket)
+        if data is None:
             print("Connection closed")
             return False
+        try:
+            message = rps_pb2.ClientMsg.FromString(data)
+        except (DecodeError, TypeError):
+            message = rps_pb2.ClientMsg()
+        move = message.move
+        if not message.HasField("move") or move not in VALID_MOVES:
+            try:
+                await websocket.send(INVALID_MOVE_MSG)
+            except websockets.exceptions.ConnectionClosed:
+                print("Connection closed")
+            return False
+        if websocket is self.player1_ws:
+            self.move1 = move
+        else:
+            self.move2 = move
+        return True
 
     async def determine_winner(self):
         """
         Determines the winner based on the players' moves and broadcasts the result.
         """
-        move1 = self.players[self.player1_ws]
-        move2 = self.players[self.player2_ws]
-        result = self.get_result(move1, move2)
-        await self.broadcast({"type": "result", "move1": move1, "move2": move2, "result": result})
-        self.game_over = True
+        await self.broadcast(RESULT_MSGS[self.move1][self.move2])
 
-    def get_result(self, move1, move2):
+    async def broadcast(self, payload):
         """
-        Determines the result of the game using traditional Rock-Paper-Scissors rules.
+        Sends a message to both players.
 
         Args:
-            move1 (str): Move of Player 1.
-            move2 (str): Move of Player 2.
+            payload (bytes): The serialized message to broadcast.
+        """
+        await asyncio.gather(
+            self.player1_ws.send(payload),
+            self.player2_ws.send(payload),
+        )
 
-        Returns:
-            str: 'player1' if Player 1 wins, 'player2' if Player 2 wins, 'draw' if it's a tie.
+    async def start(self):
         """
-        if move1 == move2:
-            return "draw"
-        wins = {"rock": "scissors", "scissors": "paper", "paper": "rock"}
-        return "player1" if wins[move1] == move2 else "player2"
+        Sends game start messages to both players.
+        """
+        await asyncio.gather(
+            self.player1_ws.send(START_P1_MSG),
+            self.player2_ws.send(START_P2_MSG),
+        )
 
-    async def broadcast(self, message):
+    async def play_round(self):
         """
-        Sends a message to both players.
+        Plays a single round: collects both moves and determines the winner.
 
-        Args:
-            message (dict): The message to broadcast.
+        Returns:
+            bool: True if the round was completed, False if a player disconnected or made an invalid move.
         """
-        await self.player1_ws.send(json.dumps(message))
-        await self.player2_ws.send(json.dumps(message))
+        await self.broadcast(YOUR_MOVE_MSG)
+
+        results = await asyncio.gather(
+            self.receive_move(self.player1_ws),
+            self.receive_move(self.player2_ws),
+        )
+
+        if not all(results):
+            await self.broadcast(ROUND_ERROR_MSG)
+            return False
+
+        await self.determine_winner()
+        return True
 
     async def ask_for_rematch(self):
         """
         Prompts both players to decide if they want a rematch.
 
-        If both players agree, the game state is reset and a new game begins.
-        Otherwise, the game ends.
+        If either player declines, the players are told that the game is over.
+
+        Returns:
+            bool: True if both players agreed to a rematch, otherwise False.
         """
-        await self.broadcast({"type": "rematch"})
+        await self.broadcast(REMATCH_MSG)
         responses = await asyncio.gather(
             self.receive_response(self.player1_ws),
             self.receive_response(self.player2_ws),
         )
         if all(responses):
-            self.reset_game()
-            await start_game(self)
-        else:
-            await self.broadcast({"type": "end", "message": "Game over."})
+            return True
+        await self.broadcast(END_MSG)
+        return False
 
     async def receive_response(self, websocket):
         """
@@ -113,19 +209,39 @@ class RockPaperScissorsGame:
         Returns:
             bool: True if the player agrees to a rematch, otherwise False.
         """
-        try:
-            data = await websocket.recv()
-            message = json.loads(data)
-            return message.get("rematch") == "yes"
-        except websockets.exceptions.ConnectionClosed:
-            return False
+        return await self.receive(websocket) == REMATCH_YES
 
     def reset_game(self):
         """
         Resets the game state for a new round.
         """
-        self.players = {self.player1_ws: None, self.player2_ws: None}
-        self.game_over = False
+        self.move1 = None
+        self.move2 = None
+
+async def reader(websocket, queue):
+    """
+    Reads frames from a player's connection into a queue until the connection closes.
+
+    Frames received while the player is still waiting for an opponent are dropped,
+    so they cannot be taken as the player's first move. When the queue is full,
+    reading pauses until the game consumes a frame.
+
+    Args:
+        websocket (websockets.WebSocketServerProtocol): The WebSocket connection of the player.
+        queue (asyncio.Queue): The bounded queue to put received frames into. None is put last.
+    """
+    try:
+        async for data in websocket:
+            if websocket in waiting_players:
+                continue
+            await queue.put(data)
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    finally:
+        if queue.full():
+            # The connection is gone; make room for the close marker.
+            queue.get_nowait()
+        queue.put_nowait(None)
 
 async def handler(websocket):
     """
@@ -135,58 +251,31 @@ async def handler(websocket):
         websocket (websockets.WebSocketServerProtocol): The incoming WebSocket connection.
     """
     print("New connection")
+    set_nodelay(websocket)
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    reader_task = asyncio.create_task(reader(websocket, queue))
     try:
         if waiting_players:
-            opponent_ws = waiting_players.pop(0)
-            game = RockPaperScissorsGame(opponent_ws, websocket)
-            await start_game(game)
+            opponent_ws, opponent_queue = waiting_players.popitem(last=False)
+            game = RockPaperScissorsGame(opponent_ws, opponent_queue, websocket, queue)
+            await game.start()
+            while True:
+                if not await game.play_round():
+                    break
+                if not await game.ask_for_rematch():
+                    break
+                game.reset_game()
         else:
-            waiting_players.append(websocket)
-            await websocket.send(json.dumps({"type": "waiting", "message": "Waiting for an opponent..."}))
+            waiting_players[websocket] = queue
+            await websocket.send(WAITING_MSG)
             await websocket.wait_closed()
     except websockets.exceptions.ConnectionClosed:
         print("Connection closed")
     finally:
-        if websocket in waiting_players:
-            waiting_players.remove(websocket)
-
-async def start_game(game):
-    """
-    Sends game start messages to both players and begins the game loop.
-
-    Args:
-        game (RockPaperScissorsGame): The game instance.
-    """
-    await game.player1_ws.send(json.dumps({"type": "start", "player": "player1", "message": "Game started. You are Player 1"}))
-    await game.player2_ws.send(json.dumps({"type": "start", "player": "player2", "message": "Game started. You are Player 2"}))
-    await game_loop(game)
-
-async def game_loop(game):
-    """
-    The main game loop for handling moves and determining the winner.
-
-    Args:
-        game (RockPaperScissorsGame): The game instance.
-    """
-    while not game.game_over:
-        await game.player1_ws.send(json.dumps({"type": "your_move", "message": "Enter your move (rock, paper, or scissors):"}))
-        await game.player2_ws.send(json.dumps({"type": "your_move", "message": "Enter your move (rock, paper, or scissors):"}))
-
-        results = await asyncio.gather(
-            game.receive_move(game.player1_ws),
-            game.receive_move(game.player2_ws),
-        )
-
-        if not all(results):
-            await game.broadcast({"type": "error", "message": "A player disconnected or made an invalid move."})
-            break
-
-        await game.determine_winner()
-        break
-
-    await game.ask_for_rematch()
+        reader_task.cancel()
+        waiting_players.pop(websocket, None)
 
-waiting_players = []
+waiting_players = OrderedDict()  # websocket -> queue of players waiting for an opponent, oldest first
 
 async def main():
     """
@@ -194,9 +283,12 @@ async def main():
 
     Listens for incoming connections and manages game sessions.
     """
-    async with websockets.serve(handler, "localhost", 6789):
+    async with websockets.serve(handler, "localhost", 6789, compression=None):
         print("Server started at ws://localhost:6789")
         await asyncio.Future()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())